@@ -0,0 +1,34 @@
+import math
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def max_drawdown(equity: np.ndarray) -> float:
+    """
+    Maximum drawdown of the equity curve.
+
+    :param equity: Equity curve (portfolio values).
+    :return: Maximum drawdown as positive fraction, e.g. 0.25 for 25% drawdown.
+    """
+    peak = equity[0]
+    draw_down = 0.0
+    for value in equity:
+        peak = max(peak, value)
+        draw_down = min(draw_down, value / peak - 1.0)
+    return -draw_down
+
+
+@njit(cache=True)
+def sharpe_annual(returns: np.ndarray, factor: int = 365) -> float:
+    """
+    Annualized Sharpe ratio with zero risk-free rate (population standard deviation).
+
+    :param returns: Periodic returns.
+    :param factor: Number of periods per year.
+    :return: Annualized Sharpe ratio, 0.0 for zero volatility.
+    """
+    mean = returns.mean()
+    std = returns.std()
+    return (mean / std) * math.sqrt(factor) if std > 0.0 else 0.0
@@ -1,27 +1,34 @@
-from typing import Optional
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
 
 
+@dataclass(slots=True)
 class BacktestResult:
-    def __init__(
-        self,
-        token_ticker: Optional[str] = None,
-        denomination_ticker: Optional[str] = None,
-        strategy_name: Optional[str] = None,
-        total_returns: Optional[list[float]] = None,
-        sharpe_ratio: Optional[float] = None,
-        max_draw_down: Optional[float] = None,
-        with_graphs: Optional[bool] = None,
-        cash: Optional[float] = None,
-        bokeh_report_path: Optional[str] = None,
-        quantstats_report_path: Optional[str] = None,
-    ) -> None:
-        self.token_ticker: Optional[str] = token_ticker
-        self.denomination_ticker: Optional[str] = denomination_ticker
-        self.strategy_name: Optional[str] = strategy_name
-        self.total_returns: Optional[list[float]] = total_returns
-        self.sharpe_ratio: Optional[float] = sharpe_ratio
-        self.max_draw_down: Optional[float] = max_draw_down
-        self.with_graphs: Optional[bool] = with_graphs
-        self.cash: Optional[float] = cash
-        self.bokeh_report_path: Optional[str] = bokeh_report_path
-        self.quantstats_report_path: Optional[str] = quantstats_report_path
+    token_ticker: Optional[str] = None
+    denomination_ticker: Optional[str] = None
+    strategy_name: Optional[str] = None
+    total_returns: Optional[list[float]] = None
+    sharpe_ratio: Optional[float] = None
+    max_draw_down: Optional[float] = None
+    with_graphs: Optional[bool] = None
+    cash: Optional[float] = None
+    bokeh_report_path: Optional[str] = None
+    quantstats_report_path: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Converts result to dictionary.
+
+        :return: Dictionary with result fields.
+        """
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BacktestResult":
+        """
+        Creates result from dictionary.
+
+        :param data: Dictionary with result fields.
+        :return: BacktestResult object.
+        """
+        return cls(**data)
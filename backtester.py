@@ -1,17 +1,33 @@
 import logging
-from datetime import datetime
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Final, Optional
 
 import backtrader as bt
+import matplotlib
+import numpy as np
 import quantstats as qs
 from backtrader import Cerebro
 from backtrader_plotting import Bokeh
-from pandas import DataFrame
+from pandas import Series
 
+from analytics import max_drawdown, sharpe_annual
 from backtest_result import BacktestResult
-from daily_data_feed import PandasDataFeedDaily
+from daily_data_feed import NumpyOHLCVFeed, OHLCVArrays
 from fractional_commission_info import FractionalCommissionInfo
 from strategies import KDJ, KDJStrategy
 
+# Directory for HTML reports.
+REPORTS_DIR: Final[Path] = Path("./reports")
+REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+
+# Reports are rendered off the main thread -> non-interactive backend, and pyplot (used by Quantstats)
+# is not thread-safe -> one Quantstat report at a time per process.
+matplotlib.use("Agg")
+_QUANTSTATS_LOCK: threading.Lock = threading.Lock()
+
 
 class Backtester:
     """
@@ -20,18 +36,30 @@ class Backtester:
 
     def __init__(
         self,
-        with_graphs: bool = True,
+        with_graphs: Optional[bool] = None,
         starting_cash: float = 100_000.0,
         commission: float = 0.0,
+        with_bokeh: bool = False,
+        with_quantstats: bool = False,
     ) -> None:
         """
         Constructor.
 
-        :param with_graphs: Flag for plotting graphs.
+        :param with_graphs: Deprecated, flag for both Bokeh and Quantstat reports.
         :param starting_cash: Starting cash for backtesting strategy.
         :param commission: Commission.
+        :param with_bokeh: Flag for Bokeh HTML report.
+        :param with_quantstats: Flag for Quantstat HTML report.
         """
-        self._with_graphs: bool = with_graphs
+        if with_graphs:
+            logging.warning(
+                "Parameter 'with_graphs' is deprecated, use 'with_bokeh' and 'with_quantstats'."
+            )
+            with_bokeh: bool = True
+            with_quantstats: bool = True
+        self._with_bokeh: bool = with_bokeh
+        self._with_quantstats: bool = with_quantstats
+        self._with_graphs: bool = with_bokeh or with_quantstats
         self._starting_cash: float = starting_cash
         self._commission: float = commission
 
@@ -40,10 +68,42 @@ class Backtester:
         token_ticker: str,
         denomination_ticker: str,
         strategy_name: str,
-        price_data: DataFrame,
+        price_data: OHLCVArrays,
     ) -> BacktestResult:
+        """
+        Backtests strategy on given price data and renders reports.
+
+        :param token_ticker: Lower-case token ticker.
+        :param denomination_ticker: Denomination ticker.
+        :param strategy_name: Strategy name.
+        :param price_data: Tuple of dates, open, high, low, close and volume arrays.
+        :return: BacktestResult object.
+        """
+        br, cerebro, returns = self._run_cerebro(
+            token_ticker=token_ticker,
+            denomination_ticker=denomination_ticker,
+            strategy_name=strategy_name,
+            price_data=price_data,
+        )
+        self._render_reports(br=br, cerebro=cerebro, returns=returns)
+        return br
 
-        token_ticker: str = token_ticker.lower()
+    def _run_cerebro(
+        self,
+        token_ticker: str,
+        denomination_ticker: str,
+        strategy_name: str,
+        price_data: OHLCVArrays,
+    ) -> tuple[BacktestResult, Cerebro, Series]:
+        """
+        Backtests strategy on given price data, reports are not rendered.
+
+        :param token_ticker: Lower-case token ticker.
+        :param denomination_ticker: Denomination ticker.
+        :param strategy_name: Strategy name.
+        :param price_data: Tuple of dates, open, high, low, close and volume arrays.
+        :return: Tuple of BacktestResult object, finished Cerebro engine and daily returns.
+        """
         denomination_ticker: str = denomination_ticker.lower()
         strategy_name: str = strategy_name.lower()
         # backtest_name: str = f"Backtest of {token_ticker} in {denomination_ticker} with {strategy_name} strategy"
@@ -53,15 +113,23 @@ class Backtester:
 
         # Add the trading strategy.
         if strategy_name == KDJ:
-            logging.info(f"Selecting {strategy_name} strategy.")
+            logging.info("Selecting %s strategy.", strategy_name)
             cerebro.addstrategy(KDJStrategy)
 
         else:
-            logging.error(f"Unknown strategy: '{strategy_name}' strategy.")
+            logging.error("Unknown strategy: '%s' strategy.", strategy_name)
             raise Exception(f"Unknown strategy: '{strategy_name}' strategy.")
 
         # Add data.
-        feed: bt.feeds.PandasData = PandasDataFeedDaily(dataname=price_data)
+        dates, opens, highs, lows, closes, volumes = price_data
+        feed: NumpyOHLCVFeed = NumpyOHLCVFeed(
+            dates=dates,
+            opens=opens,
+            highs=highs,
+            lows=lows,
+            closes=closes,
+            volumes=volumes,
+        )
         cerebro.adddata(feed, name=f"{token_ticker} in {denomination_ticker}")
 
         # Set cash.
@@ -77,22 +145,11 @@ class Backtester:
         # Add observers that are used in plots.
         cerebro.addobserver(bt.observers.DrawDown)
 
-        # Add preferred analyzers for generating performance metrics for the strategy.
-        cerebro.addanalyzer(
-            bt.analyzers.SharpeRatio,
-            _name="SharpeRatio",
-            riskfreerate=0,
-            timeframe=bt.TimeFrame.Days,
-            compression=1,
-            factor=365,
-            annualize=True,
-        )
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="DrawDown")
+        # Add PyFolio analyzer, performance metrics are computed from its returns.
         cerebro.addanalyzer(bt.analyzers.PyFolio, _name="PyFolio")
-        cerebro.addanalyzer(bt.analyzers.AnnualReturn, _name="AnnualReturn")
 
         # Backtest!
-        logging.info(f"Starting portfolio value: {cerebro.broker.getvalue()}")
+        logging.info("Starting portfolio value: %s", cerebro.broker.getvalue())
         results = cerebro.run()
         strat = results[0]
         returns, positions, transactions, gross_lev = strat.analyzers.getbyname(
@@ -100,55 +157,78 @@ class Backtester:
         ).get_pf_items()
         returns.index = returns.index.tz_convert(None)
         logging.info(
-            f"Final portfolio value: ${cerebro.broker.getvalue():.2f} "
-            f"(starting value: ${self._starting_cash:.2f})"
+            "Final portfolio value: $%.2f (starting value: $%.2f)",
+            cerebro.broker.getvalue(),
+            self._starting_cash,
         )
 
+        # Performance metrics computed from daily returns in one go.
+        returns_array: np.ndarray = returns.to_numpy(dtype=np.float64)
+        equity: np.ndarray = np.concatenate(([1.0], np.cumprod(1.0 + returns_array)))
+        yearly_growth: Series = (1.0 + returns).groupby(returns.index.year).prod()
+        annual_returns: Series = yearly_growth - 1.0
+
         # Build result.
-        br: BacktestResult = BacktestResult()
-        br.token_ticker = token_ticker
-        br.denomination_ticker = denomination_ticker
-        br.strategy_name = strategy_name
-        br.total_returns = strat.analyzers.getbyname("AnnualReturn").rets
-        br.sharpe_ratio = strat.analyzers.getbyname("SharpeRatio").rets["sharperatio"]
-        br.max_draw_down = strat.analyzers.getbyname("DrawDown").rets["max"]["drawdown"]
-        br.with_graphs = self._with_graphs
-        br.cash = strat.broker.get_cash()
-
-        # Plot the result.
+        br: BacktestResult = BacktestResult(
+            token_ticker=token_ticker,
+            denomination_ticker=denomination_ticker,
+            strategy_name=strategy_name,
+            total_returns=annual_returns.tolist(),
+            sharpe_ratio=sharpe_annual(returns_array, 365),
+            max_draw_down=100.0 * max_drawdown(equity),
+            with_graphs=self._with_graphs,
+            cash=strat.broker.get_cash(),
+        )
+
+        # Report paths.
         if self._with_graphs:
-            report_path: str = (
-                f"./reports/{str(datetime.now().strftime('%Y-%m-%d_%H-%M-%S'))}_"
+            # Nanosecond timestamp + PID -> unique also for parallel backtests.
+            report_path: str = str(
+                REPORTS_DIR / f"{time.time_ns()}_{os.getpid()}_"
                 f"{strategy_name}_strategy_"
                 f"{token_ticker}_in_{denomination_ticker}_"
             )
-            bokeh_report_path: str = f"{report_path}bokeh_report.html"
-            quantstats_report_path: str = f"{report_path}quantstat_report.html"
-            br.bokeh_report_path = bokeh_report_path
-            br.quantstats_report_path = quantstats_report_path
-
-            # Quantstat report.
-            qs.reports.html(
-                returns,
-                output=quantstats_report_path,
-                download_filename=quantstats_report_path,
-                title=strategy_name,
-                periods_per_year=365,
-            )
+            if self._with_bokeh:
+                br.bokeh_report_path = f"{report_path}bokeh_report.html"
+            if self._with_quantstats:
+                br.quantstats_report_path = f"{report_path}quantstat_report.html"
 
-            # Backtrader Bokeh report.
+        return br, cerebro, returns
+
+    def _render_reports(
+        self, br: BacktestResult, cerebro: Cerebro, returns: Series
+    ) -> None:
+        """
+        Renders Quantstat and Bokeh HTML reports of finished backtest.
+
+        :param br: BacktestResult object.
+        :param cerebro: Finished Cerebro engine.
+        :param returns: Daily returns.
+        :return: None.
+        """
+        # Quantstat report.
+        if self._with_quantstats:
+            with _QUANTSTATS_LOCK:
+                qs.reports.html(
+                    returns,
+                    output=br.quantstats_report_path,
+                    download_filename=br.quantstats_report_path,
+                    title=br.strategy_name,
+                    periods_per_year=365,
+                )
+
+        # Backtrader Bokeh report.
+        if self._with_bokeh:
             try:
                 bpl: Bokeh = Bokeh(
                     style="bar",
                     plot_mode="single",
-                    filename=bokeh_report_path,
+                    filename=br.bokeh_report_path,
                     show=False,
                 )
                 cerebro.plot(bpl)
             except Exception as error:
                 logging.warning(
-                    f"Can not create interactive Bokeh HTML reports. Error: {error}"
+                    "Can not create interactive Bokeh HTML reports. Error: %s", error
                 )
                 # raise error
-
-        return br
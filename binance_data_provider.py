@@ -1,14 +1,38 @@
-import datetime as dt
+import asyncio
 import logging
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 from binance.client import Client
 from pandas import DataFrame, Timestamp
+from requests.adapters import HTTPAdapter
 
+from daily_data_feed import OHLCVArrays
 from data_provider import DataProvider
 
 
+@lru_cache(maxsize=4)
+def _get_client(api_key: str, api_secret: str) -> Client:
+    """
+    Returns Binance client shared by all providers with the same credentials.
+
+    The client's HTTP session keeps connections alive, so the TLS handshake is not repeated per request.
+
+    :param api_key: Binance API key.
+    :param api_secret: Binance API secret.
+    :return: Binance client.
+    """
+    client: Client = Client(api_key=api_key, api_secret=api_secret)
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=16, pool_maxsize=32, max_retries=3
+    )
+    client.session.mount("https://", adapter)
+    return client
+
+
 class BinanceDataProvider(DataProvider):
     """
     BinanceDataProvider class.
@@ -29,9 +53,14 @@ class BinanceDataProvider(DataProvider):
             api_key=api_key,
             api_secret=api_secret,
         )
-        self._client: Client = Client(api_key=api_key, api_secret=api_secret)
+        self._client: Client = _get_client(api_key=api_key, api_secret=api_secret)
+
+        # Local cache of already downloaded OHLCV data.
+        self._cache_dir: Path = Path("./cache/binance")
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
         logging.info(
-            f"Providing OHLCV data in {self.denomination_ticker.upper()} denomination."
+            "Providing OHLCV data in %s denomination.",
+            self.denomination_ticker.upper(),
         )
 
     def get_historical_ohlcv_data(
@@ -53,13 +82,15 @@ class BinanceDataProvider(DataProvider):
             # Default interval 1 day.
             tick_interval: str = "1d"
             logging.warning(
-                f"Tick interval was not set - setting default value: '{tick_interval}'."
+                "Tick interval was not set - setting default value: '%s'.",
+                tick_interval,
             )
         if not past_days:
             # Default number of past days: 10_000 days.
             past_days: int = 10_000
             logging.warning(
-                f"Number of past days was not set - setting default value: '{past_days}' days."
+                "Number of past days was not set - setting default value: '%s' days.",
+                past_days,
             )
 
         # Create token in denomination ticker for Binance, e.g. UNI + USDT = UNIUSDT ticker.
@@ -68,56 +99,174 @@ class BinanceDataProvider(DataProvider):
         )
 
         # Start date string in UTC format.
-        start_date_str: str = str(
-            (pd.to_datetime("today") - pd.Timedelta(str(past_days) + " days")).date()
+        start_date: Timestamp = (
+            pd.to_datetime("today") - pd.Timedelta(str(past_days) + " days")
+        ).normalize()
+        start_date_str: str = str(start_date.date())
+
+        # Load cached data and download only the missing days (older history and/or newer days).
+        cache_path: Path = (
+            self._cache_dir / f"{token_denomination_ticker}_{tick_interval}.parquet"
         )
+        cached: Optional[DataFrame] = None
+        if cache_path.is_file():
+            cached = pd.read_parquet(cache_path)
 
-        try:
-            data: DataFrame = DataFrame(
-                self._client.get_historical_klines(
-                    symbol=token_denomination_ticker,
-                    start_str=start_date_str,
-                    interval=tick_interval,
+        # Date ranges (start, inclusive end or None for "until today") to download.
+        missing_ranges: list[tuple[str, Optional[str]]] = [(start_date_str, None)]
+        if cached is not None and not cached.empty:
+            missing_ranges: list[tuple[str, Optional[str]]] = [
+                ((cached.index.max() + pd.Timedelta(days=1)).date().isoformat(), None)
+            ]
+            if cached.index.min() > start_date:
+                missing_ranges.insert(
+                    0,
+                    (
+                        start_date_str,
+                        (cached.index.min() - pd.Timedelta(days=1)).date().isoformat(),
+                    ),
                 )
+            logging.info(
+                "Using cached OHLCV data for: %s, downloading missing data: %s.",
+                token_denomination_ticker,
+                missing_ranges,
+            )
+
+        today_str: str = str(pd.to_datetime("today").date())
+        downloaded: list[DataFrame] = []
+        for range_start_str, range_end_str in missing_ranges:
+            if range_start_str >= today_str:
+                continue
+            new_data: Optional[DataFrame] = self._download_ohlcv_data(
+                token_denomination_ticker=token_denomination_ticker,
+                start_date_str=range_start_str,
+                tick_interval=tick_interval,
+                end_date_str=range_end_str,
+            )
+            if new_data is not None:
+                downloaded.append(new_data)
+
+        if downloaded:
+            cached: DataFrame = pd.concat([cached, *downloaded])
+            cached: DataFrame = cached[
+                ~cached.index.duplicated(keep="last")
+            ].sort_index()
+            cached.to_parquet(cache_path, compression="zstd")
+
+        if cached is None:
+            return None
+
+        data: DataFrame = cached
+        return data[data.index >= start_date]
+
+    def get_historical_ohlcv_arrays(
+        self,
+        token_ticker: str,
+        past_days: Optional[int] = None,
+        tick_interval: Optional[str] = None,
+    ) -> Optional[OHLCVArrays]:
+        """
+        Returns historical K-lines (candlestick data) as NumPy arrays.
+
+        :param token_ticker: Token/Coin ticker e.g. uni, 1inch, etc.
+        :param past_days: How many days back one wants to download the data.
+        :param tick_interval: Tick interval for bars, e.g. 1d.
+        :return: Tuple of dates, open, high, low, close and volume arrays.
+        """
+        # Still goes through a DataFrame, the Parquet cache stores and slices data as DataFrame.
+        data: Optional[DataFrame] = self.get_historical_ohlcv_data(
+            token_ticker=token_ticker,
+            past_days=past_days,
+            tick_interval=tick_interval,
+        )
+        if data is None:
+            return None
+
+        return (
+            data.index.to_numpy(),
+            data["open"].to_numpy(),
+            data["high"].to_numpy(),
+            data["low"].to_numpy(),
+            data["close"].to_numpy(),
+            data["volume"].to_numpy(),
+        )
+
+    async def get_historical_ohlcv_arrays_async(
+        self,
+        token_ticker: str,
+        past_days: Optional[int] = None,
+        tick_interval: Optional[str] = None,
+    ) -> Optional[OHLCVArrays]:
+        """
+        Asynchronous version of get_historical_ohlcv_arrays, the blocking download runs in a worker thread.
+
+        :param token_ticker: Token/Coin ticker e.g. uni, 1inch, etc.
+        :param past_days: How many days back one wants to download the data.
+        :param tick_interval: Tick interval for bars, e.g. 1d.
+        :return: Tuple of dates, open, high, low, close and volume arrays.
+        """
+        return await asyncio.to_thread(
+            self.get_historical_ohlcv_arrays,
+            token_ticker=token_ticker,
+            past_days=past_days,
+            tick_interval=tick_interval,
+        )
+
+    def _download_ohlcv_data(
+        self,
+        token_denomination_ticker: str,
+        start_date_str: str,
+        tick_interval: str,
+        end_date_str: Optional[str] = None,
+    ) -> Optional[DataFrame]:
+        """
+        Downloads K-lines (candlestick data) from Binance since given start date.
+
+        :param token_denomination_ticker: Binance symbol, e.g. UNIUSDT.
+        :param start_date_str: Start date string in UTC format.
+        :param tick_interval: Tick interval for bars, e.g. 1d.
+        :param end_date_str: Inclusive end date string in UTC format, None means until today.
+        :return: OHLCV data in DataFrame format with date as index.
+        """
+        try:
+            raw: list[list] = self._client.get_historical_klines(
+                symbol=token_denomination_ticker,
+                start_str=start_date_str,
+                end_str=end_date_str,
+                interval=tick_interval,
             )
         except Exception as error:
             logging.warning(
-                f"Skipping: Binance does not have OHLCV data for: {token_denomination_ticker}"
+                "Skipping: Binance does not have OHLCV data for: %s",
+                token_denomination_ticker,
             )
-            logging.debug(f"Error: {error}")
+            logging.debug("Error: %s", error)
             return None
 
-        data.columns = [
-            "open_time",
-            "open",
-            "high",
-            "low",
-            "close",
-            "volume",
-            "close_time",
-            "qav",
-            "num_trades",
-            "taker_base_vol",
-            "taker_quote_vol",
-            "is_best_match",
-        ]
-        data.index = [
-            Timestamp(dt.datetime.fromtimestamp(x / 1000).date())
-            for x in data.open_time
-        ]
-        data: DataFrame = data[["open", "high", "low", "close", "volume"]]
-
-        # Convert data to floats.
-        data: DataFrame = data.astype(
-            {
-                "open": "float",
-                "high": "float",
-                "low": "float",
-                "close": "float",
-                "volume": "float",
-            }
+        if not raw:
+            return None
+
+        # K-line row: open time, open, high, low, close, volume, close time, ...
+        # Parse needed columns (prices are strings) in one pass into typed arrays.
+        n: int = len(raw)
+        open_time: np.ndarray = np.empty(n, dtype=np.int64)
+        ohlcv: np.ndarray = np.empty((5, n), dtype=np.float64)
+        for i, row in enumerate(raw):
+            open_time[i] = row[0]
+            ohlcv[0, i] = float(row[1])
+            ohlcv[1, i] = float(row[2])
+            ohlcv[2, i] = float(row[3])
+            ohlcv[3, i] = float(row[4])
+            ohlcv[4, i] = float(row[5])
+
+        # Transposed view has the layout of DataFrame's float block -> no copy.
+        data: DataFrame = DataFrame(
+            ohlcv.T,
+            columns=["open", "high", "low", "close", "volume"],
+            index=pd.to_datetime(open_time, unit="ms").floor("D"),
         )
 
         # Drop last 1 day - which means "toda" (incomplete data).
-        data: DataFrame = data[:-1]
+        if end_date_str is None:
+            data: DataFrame = data[:-1]
         return data
@@ -0,0 +1,33 @@
+"""
+Ahead-of-time compilation of KDJ kernels into native kdj_kernels extension module.
+
+Usage: python build_kdj_aot.py
+"""
+from pathlib import Path
+
+from numba.pycc import CC
+
+from strategies_jit import (
+    AOT_HASH_FILE,
+    aot_source_hash,
+    compute_kdj,
+    kdj_signals,
+    rolling_max,
+    rolling_min,
+)
+
+cc: CC = CC("kdj_kernels")
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+# Kernels are compiled from the same Python source as the JIT versions.
+cc.export("compute_kdj", "UniTuple(f8[:], 3)(f8[:], f8[:], f8[:], i8)")(
+    compute_kdj.py_func
+)
+cc.export("kdj_signals", "i1[:](f8[:], f8[:])")(kdj_signals.py_func)
+cc.export("rolling_max", "f8[:](f8[:], i8)")(rolling_max.py_func)
+cc.export("rolling_min", "f8[:](f8[:], i8)")(rolling_min.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
+    # strategies.py ignores the module when the sources change after this build.
+    AOT_HASH_FILE.write_text(aot_source_hash())
@@ -1,14 +1,63 @@
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
 
 from starlette.config import Config
 from starlette.datastructures import Secret
 
-config: Config = Config(".env")
 
-# Logging configurations.
-LOGGING_DEBUG: bool = config("LOGGING_DEBUG", cast=bool, default=False)
-LOG_TO_FILE: bool = config("LOG_TO_FILE", cast=bool, default=True)
-LOGGING_LEVEL: int = logging.DEBUG if LOGGING_DEBUG else logging.INFO
+@lru_cache(maxsize=None)
+def _env_config() -> Config:
+    """
+    Returns configuration loaded from .env file, which is read on the first call only.
 
-BINANCE_API_KEY: Secret = config("BINANCE_API_KEY", cast=Secret)
-BINANCE_API_SECRET: Secret = config("BINANCE_API_SECRET", cast=Secret)
+    :return: Config object.
+    """
+    return Config(".env")
+
+
+@lru_cache(maxsize=None)
+def _secret(name: str) -> Secret:
+    """
+    Returns secret from configuration, it is read on the first access only.
+
+    :param name: Name of the secret.
+    :return: Secret.
+    """
+    return _env_config()(name, cast=Secret)
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Settings class.
+    """
+
+    # Logging configurations.
+    LOGGING_DEBUG: bool
+    LOG_TO_FILE: bool
+    LOGGING_LEVEL: int
+
+    @property
+    def BINANCE_API_KEY(self) -> Secret:
+        return _secret("BINANCE_API_KEY")
+
+    @property
+    def BINANCE_API_SECRET(self) -> Secret:
+        return _secret("BINANCE_API_SECRET")
+
+
+@lru_cache(maxsize=None)
+def get_config() -> Settings:
+    """
+    Returns settings, configuration is parsed on the first call only.
+
+    :return: Settings object.
+    """
+    config: Config = _env_config()
+    logging_debug: bool = config("LOGGING_DEBUG", cast=bool, default=False)
+    return Settings(
+        LOGGING_DEBUG=logging_debug,
+        LOG_TO_FILE=config("LOG_TO_FILE", cast=bool, default=True),
+        LOGGING_LEVEL=logging.DEBUG if logging_debug else logging.INFO,
+    )
@@ -1,28 +1,77 @@
 from datetime import datetime
 
-from backtrader.feeds import PandasData
-
-
-class PandasDataFeedDaily(PandasData):
-    lines: tuple = ()
-
-    params: tuple = (
-        # Possible values for datetime (must always be present)
-        #  None : datetime is the "index" in the Pandas Dataframe
-        #  -1 : autodetect position or case-wise equal name
-        #  >= 0 : numeric index to the colum in the pandas dataframe
-        #  string : column name (as index) in the pandas dataframe
-        ("fromdate", datetime(2010, 1, 1)),
-        ("dtformat", "%Y-%m-%d"),
-        ("datetime", None),
-        # Possible values below:
-        #  None : column not present
-        #  -1 : autodetect position or case-wise equal name
-        #  >= 0 : numeric index to the colum in the pandas dataframe
-        #  string : column name (as index) in the pandas dataframe
-        ("open", "open"),
-        ("high", "high"),
-        ("low", "low"),
-        ("close", "close"),
-        ("volume", "volume"),
-    )
+import numpy as np
+from backtrader.feed import DataBase
+
+# Dates, open, high, low, close and volume arrays.
+OHLCVArrays = tuple[
+    np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray
+]
+
+# Backtrader date number of 1970-01-01 (see backtrader.utils.date2num).
+_EPOCH_DATE_NUM: float = 719_163.0
+_NS_PER_DAY: float = 86_400e9
+
+
+class NumpyOHLCVFeed(DataBase):
+    """
+    Daily data feed loading bars directly from pre-staged NumPy arrays, without a DataFrame round-trip.
+    """
+
+    params: tuple = (("fromdate", datetime(2010, 1, 1)),)
+
+    def __init__(
+        self,
+        *,
+        dates: np.ndarray,
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        volumes: np.ndarray,
+    ) -> None:
+        """
+        Constructor.
+
+        :param dates: Bar dates (datetime64).
+        :param opens: Open prices.
+        :param highs: High prices.
+        :param lows: Low prices.
+        :param closes: Close prices.
+        :param volumes: Volumes.
+        """
+        super().__init__()
+        date_nums: np.ndarray = (
+            dates.astype("datetime64[ns]").astype(np.int64) / _NS_PER_DAY
+            + _EPOCH_DATE_NUM
+        )
+        self._arrays: tuple[np.ndarray, ...] = (
+            date_nums,
+            np.asarray(opens, dtype=np.float64),
+            np.asarray(highs, dtype=np.float64),
+            np.asarray(lows, dtype=np.float64),
+            np.asarray(closes, dtype=np.float64),
+            np.asarray(volumes, dtype=np.float64),
+        )
+        self._i: int = 0
+
+    def start(self) -> None:
+        super().start()
+        self._i = 0
+
+    def _load(self) -> bool:
+        i: int = self._i
+        if i >= self._arrays[0].shape[0]:
+            return False
+
+        lines = self.lines
+        date_nums, opens, highs, lows, closes, volumes = self._arrays
+        lines.datetime[0] = date_nums[i]
+        lines.open[0] = opens[i]
+        lines.high[0] = highs[i]
+        lines.low[0] = lows[i]
+        lines.close[0] = closes[i]
+        lines.volume[0] = volumes[i]
+        lines.openinterest[0] = 0.0
+        self._i = i + 1
+        return True
@@ -1,57 +1,142 @@
 import argparse
+import asyncio
 import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from logging.handlers import QueueListener
+from multiprocessing.queues import Queue
+from pathlib import Path
 from typing import Optional
 
+import orjson
 from pandas import DataFrame
 
 from backtest_result import BacktestResult
 from backtester import Backtester
 from binance_data_provider import BinanceDataProvider
-from config import BINANCE_API_KEY, BINANCE_API_SECRET
+from config import Settings, get_config
+from daily_data_feed import OHLCVArrays
 from data_provider import BINANCE_DATA_PROVIDER, DataProvider
-from utils import logging_setup
+from utils import logging_listener, logging_setup, worker_logging_setup
+
+# Max. number of concurrent requests to the data provider (Binance limit is 1200 requests/min).
+MAX_CONCURRENT_REQUESTS: int = 16
+
+
+async def _gather_data_async(
+    dp: BinanceDataProvider, token_tickers: list[str]
+) -> list[Optional[OHLCVArrays]]:
+    """
+    Gather OHLCV data for all token tickers concurrently.
+
+    :param dp: BinanceDataProvider object.
+    :param token_tickers: List of token tickers for which gather OHLCV data.
+    :return: List of OHLCV data arrays in the order of token tickers.
+    """
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+    async def _get(token_ticker: str) -> Optional[OHLCVArrays]:
+        async with semaphore:
+            logging.info("Gathering OHLCV data for: %s", token_ticker.upper())
+            return await dp.get_historical_ohlcv_arrays_async(token_ticker=token_ticker)
+
+    # Duplicate tickers would read/write the same cache file concurrently -> download each ticker once.
+    unique_tickers: list[str] = list(dict.fromkeys(token_tickers))
+    ohlcv_data: dict[str, Optional[OHLCVArrays]] = dict(
+        zip(
+            unique_tickers,
+            await asyncio.gather(
+                *[_get(token_ticker) for token_ticker in unique_tickers]
+            ),
+        )
+    )
+    return [ohlcv_data[token_ticker] for token_ticker in token_tickers]
 
 
 def gather_data(
     token_tickers: list[str],
     data_provider_name: Optional[str],
-) -> tuple[dict[str, DataFrame], DataProvider]:
+) -> tuple[dict[str, OHLCVArrays], DataProvider]:
     """
     Gather OHLCV data.
 
     :param token_tickers: List of token tickers for which gather OHLCV data.
     :param data_provider_name: Data provider name.
-    :return: Tuple of dictionary with token ticker as name and OHLCV data DataFrame as value and DataProvider object.
+    :return: Tuple of dictionary with token ticker as name and OHLCV data arrays as value and DataProvider object.
     """
     if not data_provider_name:
         data_provider_name: str = BINANCE_DATA_PROVIDER
         logging.warning(
-            f"No data provider was entered. Setting it to: '{data_provider_name}' data provider."
+            "No data provider was entered. Setting it to: '%s' data provider.",
+            data_provider_name,
         )
     else:
         data_provider_name: str = data_provider_name.lower()
 
     # Set data provider.
     if data_provider_name == BINANCE_DATA_PROVIDER:
+        cfg: Settings = get_config()
         dp: BinanceDataProvider = BinanceDataProvider(
-            api_key=str(BINANCE_API_KEY), api_secret=str(BINANCE_API_SECRET)
+            api_key=str(cfg.BINANCE_API_KEY), api_secret=str(cfg.BINANCE_API_SECRET)
         )
     else:
-        logging.error(f"Unknown data provider: {data_provider_name}")
+        logging.error("Unknown data provider: %s", data_provider_name)
         raise Exception(f"Unknown data provider: {data_provider_name}")
 
-    logging.info(f"Using '{dp.data_provider_name}' data provider.")
+    logging.info("Using '%s' data provider.", dp.data_provider_name)
 
-    ohlcv_data: dict[str, DataFrame] = {}
-    for token_ticker in token_tickers:
-        logging.info(f"Gathering OHLCV data for: {token_ticker.upper()}")
-        ohlcv_data[token_ticker] = dp.get_historical_ohlcv_data(
-            token_ticker=token_ticker
-        )
+    ohlcv_data: dict[str, OHLCVArrays] = dict(
+        zip(token_tickers, asyncio.run(_gather_data_async(dp, token_tickers)))
+    )
 
     return ohlcv_data, dp
 
 
+def _run_batch(
+    args: tuple[bool, bool, list[tuple[str, str, str, OHLCVArrays]]]
+) -> list[BacktestResult]:
+    """
+    Run a batch of backtests in a worker process.
+
+    Each worker builds its own Backtester (and thus its own Cerebro engines), nothing is shared between workers.
+    Reports are rendered in background threads, so they overlap with the next backtest of the batch (Quantstat
+    reports are serialized by a lock in backtester, Bokeh reports are not).
+
+    :param args: Tuple of with Bokeh flag, with Quantstat flag and list of token ticker, denomination ticker,
+        strategy name and OHLCV data.
+    :return: List of BacktestResult objects in the batch order.
+    """
+    with_bokeh, with_quantstats, batch = args
+    backtester: Backtester = Backtester(
+        with_bokeh=with_bokeh, with_quantstats=with_quantstats
+    )
+    backtesting_results: list[BacktestResult] = []
+    report_futures: list[Future] = []
+    with ThreadPoolExecutor(max_workers=2) as report_pool:
+        for token_ticker, denomination_ticker, strategy_name, price_data in batch:
+            logging.info(
+                "Backtesting %s with %s strategy.", token_ticker.upper(), strategy_name
+            )
+            br, cerebro, returns = backtester._run_cerebro(
+                token_ticker=token_ticker,
+                denomination_ticker=denomination_ticker,
+                strategy_name=strategy_name,
+                price_data=price_data,
+            )
+            backtesting_results.append(br)
+            if br.with_graphs:
+                report_futures.append(
+                    report_pool.submit(backtester._render_reports, br, cerebro, returns)
+                )
+
+        # Wait for all reports, re-raise rendering errors.
+        for report_future in wait(report_futures).done:
+            report_future.result()
+
+    return backtesting_results
+
+
 def log_aggregated_results(backtesting_results: list[BacktestResult]) -> None:
     """
     Log aggregated results for all pairs.
@@ -65,17 +150,59 @@ def log_aggregated_results(backtesting_results: list[BacktestResult]) -> None:
     )
     for r in backtesting_results:
         logging.info(
-            f"Strategy {r.strategy_name.upper()}  | {r.token_ticker}/{r.denomination_ticker} | "
-            f"{r.sharpe_ratio:.2f} | {-1.0 * r.max_draw_down:.2f}% | "
-            f"{[f'{i * 100.0:.2f}%' for i in r.total_returns]} | ${r.cash:.2f}"
+            "Strategy %s  | %s/%s | %.2f | %.2f%% | %s | $%.2f",
+            r.strategy_name.upper(),
+            r.token_ticker,
+            r.denomination_ticker,
+            r.sharpe_ratio,
+            -1.0 * r.max_draw_down,
+            [f"{i * 100.0:.2f}%" for i in r.total_returns],
+            r.cash,
         )
 
 
+def save_results(
+    backtesting_results: list[BacktestResult], destination: Path = Path("./results")
+) -> None:
+    """
+    Save results of all pairs to Parquet file and append them to JSON lines log.
+
+    :param backtesting_results: List of BacktestResult objects.
+    :param destination: Directory for result files.
+    :return: None.
+    """
+    if not backtesting_results:
+        logging.warning("No results to save.")
+        return
+
+    destination.mkdir(parents=True, exist_ok=True)
+    rows: list[dict] = [r.to_dict() for r in backtesting_results]
+
+    # Tickers and strategy names repeat across rows -> categoricals.
+    DataFrame(rows).astype(
+        {
+            "token_ticker": "category",
+            "denomination_ticker": "category",
+            "strategy_name": "category",
+        }
+    ).to_parquet(destination / "sweep.parquet", engine="pyarrow", compression="zstd")
+    with open(destination / "results.jsonl", "ab") as results_file:
+        results_file.write(
+            b"".join(
+                orjson.dumps(row, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+                for row in rows
+            )
+        )
+    logging.info("Results saved to: %s", destination)
+
+
 def backtest(
     token_tickers: list[str],
     strategy_names: list[str],
     data_provider_name: Optional[str] = None,
     with_graphs: bool = False,
+    with_bokeh: bool = False,
+    with_quantstats: bool = False,
 ) -> None:
     """
     Entrypoint for backtesting.
@@ -83,7 +210,9 @@ def backtest(
     :param token_tickers: List of token tickers, e.g.: uni, 1inch, etc.
     :param strategy_names: List of strategy names.
     :param data_provider_name: Data provider for OHLCV prices.
-    :param with_graphs: Flag for enabling or disabling plotting.
+    :param with_graphs: Deprecated, flag for enabling both Bokeh and Quantstat reports.
+    :param with_bokeh: Flag for enabling or disabling Bokeh HTML reports.
+    :param with_quantstats: Flag for enabling or disabling Quantstat HTML reports.
     :return: None.
     """
     logging.info("Sanity check of input parameters ...")
@@ -105,7 +234,8 @@ def backtest(
             "zen",
         ]
         logging.warning(
-            f"No token ticker was provided. Using default token tickers: {token_tickers}"
+            "No token ticker was provided. Using default token tickers: %s",
+            token_tickers,
         )
 
     # Strategies.
@@ -117,6 +247,14 @@ def backtest(
         logging.error("No strategy name was provided.")
         raise Exception("No strategy name was provided.")
 
+    # Reports.
+    if with_graphs:
+        logging.warning(
+            "Flag 'with_graphs' is deprecated, use 'with_bokeh' and 'with_quantstats'."
+        )
+        with_bokeh: bool = True
+        with_quantstats: bool = True
+
     # Gather data.
     logging.info("Starting gathering OHLCV data ...")
     token_ohlcv_data, data_provider = gather_data(
@@ -124,26 +262,45 @@ def backtest(
         data_provider_name=data_provider_name,
     )
 
-    # Perform backtests.
+    # Perform backtests, token/strategy pairs are independent -> run them in parallel.
     logging.info("Starting backtesting ...")
-    backtester: Backtester = Backtester(with_graphs=with_graphs)
-    backtesting_results: list[BacktestResult] = []
-    for token_ticker, price_data in token_ohlcv_data.items():
-        for strategy_name in strategy_names:
-            logging.info(
-                f"Backtesting {token_ticker.upper()} with {strategy_name} strategy."
-            )
-            backtesting_results.append(
-                backtester.backtest(
-                    token_ticker=token_ticker,
-                    denomination_ticker=data_provider.denomination_ticker,
-                    strategy_name=strategy_name,
-                    price_data=price_data,
-                )
-            )
+    jobs: list[tuple[str, str, str, OHLCVArrays]] = [
+        (token_ticker, data_provider.denomination_ticker, strategy_name, price_data)
+        for token_ticker, price_data in token_ohlcv_data.items()
+        if price_data is not None
+        for strategy_name in strategy_names
+    ]
+    if not jobs:
+        logging.warning("No OHLCV data was gathered. Nothing to backtest.")
+        return
+
+    max_workers: int = max(1, min(os.cpu_count() or 1, len(jobs)))
+    batch_size: int = -(-len(jobs) // max_workers)
+    batches: list[tuple[bool, bool, list[tuple[str, str, str, OHLCVArrays]]]] = [
+        (with_bokeh, with_quantstats, jobs[i : i + batch_size])
+        for i in range(0, len(jobs), batch_size)
+    ]
+    # Workers (spawned or forked) send log records to the handlers of this process.
+    log_queue: Queue = multiprocessing.Queue()
+    log_listener: QueueListener = logging_listener(log_queue)
+    log_listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=worker_logging_setup,
+            initargs=(log_queue, logging.getLogger().getEffectiveLevel()),
+        ) as executor:
+            backtesting_results: list[BacktestResult] = [
+                br
+                for batch_results in executor.map(_run_batch, batches)
+                for br in batch_results
+            ]
+    finally:
+        log_listener.stop()
 
-    # Log aggregated results.
+    # Log and save aggregated results.
     log_aggregated_results(backtesting_results=backtesting_results)
+    save_results(backtesting_results=backtesting_results)
 
 
 if __name__ == "__main__":
@@ -153,7 +310,7 @@ if __name__ == "__main__":
     # Logging setup.
     logging_setup()
 
-    logging.info(f"Starting Vinter tech challenge (by Lukas Bures).")
+    logging.info("Starting Vinter tech challenge (by Lukas Bures).")
 
     logging.debug("Parsing input parameters ...")
     parser = argparse.ArgumentParser(description="Main parser")
@@ -183,10 +340,24 @@ if __name__ == "__main__":
         "--with-graphs",
         dest="with_graphs",
         action="store_true",
-        help="Plot graphs.",
+        help="Plot graphs (deprecated, same as --with-bokeh --with-quantstats).",
+    )
+    parser.add_argument(
+        "-wb",
+        "--with-bokeh",
+        dest="with_bokeh",
+        action="store_true",
+        help="Create Bokeh HTML reports.",
+    )
+    parser.add_argument(
+        "-wq",
+        "--with-quantstats",
+        dest="with_quantstats",
+        action="store_true",
+        help="Create Quantstat HTML reports.",
     )
-    parser.set_defaults(with_graphs=False)
+    parser.set_defaults(with_graphs=False, with_bokeh=False, with_quantstats=False)
 
     args = parser.parse_args()
-    logging.info(f"Input parameters: {vars(args)}")
+    logging.info("Input parameters: %s", vars(args))
     backtest(**vars(args))
@@ -3,5 +3,11 @@
 # Activate Python virtual environment.
 . .venv/bin/activate
 
+# Ahead-of-time compile KDJ kernels (when missing or built from other sources, same check as strategies.py).
+if ! ls kdj_kernels*.so > /dev/null 2>&1 \
+  || ! python -c "import sys, strategies_jit; sys.exit(not strategies_jit.aot_kernels_up_to_date())"; then
+  python build_kdj_aot.py
+fi
+
 # Execute.
-python -W ignore::FutureWarning main.py -tt uni -dp binance -us kdj -wg
+python -W ignore::FutureWarning main.py -tt uni -dp binance -us kdj -wb -wq
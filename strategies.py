@@ -1,15 +1,46 @@
 import logging
-from typing import Final
+from array import array
+from typing import Callable, Final
 
-import backtrader as bt
-from backtrader import Indicator, Strategy
-from backtrader.indicators import ExponentialMovingAverage, Highest, Lowest
+import numpy as np
+from backtrader import Indicator, Order, Strategy
+
+from strategies_jit import DEAD_CROSS, GOLDEN_CROSS, aot_kernels_up_to_date
+
+_log: logging.Logger = logging.getLogger(__name__)
+
+try:
+    # Ahead-of-time compiled kernels (python build_kdj_aot.py), no JIT warmup.
+    from kdj_kernels import compute_kdj, kdj_signals, rolling_max, rolling_min
+
+    if not aot_kernels_up_to_date():
+        _log.warning(
+            "kdj_kernels module is stale, using JIT kernels. Rebuild it: python build_kdj_aot.py"
+        )
+        raise ImportError("Stale kdj_kernels module.")
+except ImportError:
+    from strategies_jit import compute_kdj, kdj_signals, rolling_max, rolling_min
 
 # Implemented strategies.
 KDJ: Final[str] = "kdj"
 KNOWN_STRATEGIES: Final[list[str]] = [KDJ]
 
 
+class ArrayIndicator(Indicator):
+    """
+    ArrayIndicator class, replays values precomputed in an array.
+    """
+
+    lines = ("val",)
+    params = dict(array=None)
+
+    def next(self) -> None:
+        self.lines.val[0] = self.p.array[len(self) - 1]
+
+    def once(self, start: int, end: int) -> None:
+        self.lines.val.array[start:end] = array("d", self.p.array[start:end].tobytes())
+
+
 class KDJStrategy(Strategy):
     """
     KDJStrategy class.
@@ -32,37 +63,51 @@ class KDJStrategy(Strategy):
         self.bar_executed_close = None
         self.bar_executed = None
 
+        # The feed is preloaded -> whole price history is known up front, so KDJ lines
+        # and crossing signals are computed once for all bars instead of bar by bar.
+        if not len(self.data.close.array):
+            _log.error(
+                "KDJStrategy requires preloaded data feed (Cerebro preload=True)."
+            )
+            raise Exception(
+                "KDJStrategy requires preloaded data feed (Cerebro preload=True)."
+            )
+        high: np.ndarray = np.array(self.data.high.array, dtype=np.float64)
+        low: np.ndarray = np.array(self.data.low.array, dtype=np.float64)
+        close: np.ndarray = np.array(self.data.close.array, dtype=np.float64)
+
         # Highest price in X trading days.
-        self.high = Highest(self.data.high, period=self.p.h_period, plot=False)
+        self.high = ArrayIndicator(
+            self.data, array=rolling_max(high, self.p.h_period), plot=False
+        )
         # Lowest price in X trading days.
-        self.low = Lowest(self.data.low, period=self.p.l_period, plot=False)
-        # Calculate RSV value.
-
-        self.rsv = 100.0 * bt.DivByZero(
-            self.data.close - self.low, self.high - self.low, zero=0.0
+        self.low = ArrayIndicator(
+            self.data, array=rolling_min(low, self.p.l_period), plot=False
         )
-        self.rsv.plot = False
 
-        # Calculate the 3-period weighted average of rsv, the K value.
-        self.K = ExponentialMovingAverage(
-            self.rsv, period=self.p.ema_period, plot=False
+        self.K, self.D, self.J = compute_kdj(
+            self.high.p.array, self.low.p.array, close, self.p.ema_period
         )
-        # D value is 3-period weighted average of K values.
-        self.D = ExponentialMovingAverage(self.K, period=self.p.ema_period, plot=False)
-        # J=3*K-2*D
-        self.J: Indicator = 3 * self.K - 2 * self.D
-        self.J.plot = False
+        self._signals: np.ndarray = kdj_signals(self.J, self.D)
 
-    def log(self, txt: str, dt=None) -> None:
+        # Trading rules live only in the next() generated for this run (see _specialize_next).
+        self.next = _specialize_next(self)
+
+    def log(self, txt: str, *args, dt=None, level: int = logging.DEBUG) -> None:
         """
-        Logging method.
+        Logging method, message is formatted only if the level is enabled.
 
-        :param txt: Text.
+        :param txt: Text, %-format string for args.
+        :param args: Arguments of the text.
         :param dt: Date time.
+        :param level: Logging level.
         :return: None.
         """
+        if not _log.isEnabledFor(level):
+            return
+
         dt = dt or self.datas[0].datetime.date(0)
-        logging.info(f"{dt.isoformat()}: {txt}")
+        _log.log(level, "%s: " + txt, dt.isoformat(), *args)
 
     def notify_order(self, order):
         """
@@ -71,75 +116,120 @@ class KDJStrategy(Strategy):
         :param order: Order object.
         :return: None.
         """
-        if order.status is order.Submitted:
-            self.log("Order Submitted.")
-            return
-        elif order.status is order.Accepted:
-            self.log("Order Accepted.")
-            self.order = order
-            return
-        elif order.status is order.Expired:
-            self.log("Order Expired.")
-        elif order.status is order.Completed:
-            if order.isbuy():
-                self.log(
-                    f"BUY EXECUTED, "
-                    f"Price: ${order.executed.price:.2f}, "
-                    f"Cost: ${order.executed.value:.2f}, "
-                    f"Commission: ${order.executed.comm:.2f}."
-                )
-
-                self.buy_price = order.executed.price
-                self.buy_comm = order.executed.comm
-                self.bar_executed_close = self.data_close[0]
-            else:
-                self.log(
-                    f"SELL EXECUTED, "
-                    f"Price: ${order.executed.price:.2f}, "
-                    f"Cost: ${order.executed.value:.2f}, "
-                    f"Commission: ${order.executed.comm:.2f}."
-                )
-            self.bar_executed = len(self)
-        elif order.status is order.Canceled:
-            self.log("Order Canceled.")
-        elif order.status is order.Margin:
-            self.log("Order Margin.")
-        elif order.status is order.Rejected:
-            self.log("Order Rejected.")
+        _ORDER_HANDLERS.get(order.status, _on_other)(self, order)
 
-        self.order = None
+        # Submitted/accepted orders are still pending.
+        if order.status not in (Order.Submitted, Order.Accepted):
+            self.order = None
 
     def notify_trade(self, trade):
         if not trade.isclosed:
             return
 
         self.log(
-            f"OPERATION PROFIT, GROSS: ${trade.pnl:.2f}, NET: ${trade.pnlcomm:.2f}"
+            "OPERATION PROFIT, GROSS: $%.2f, NET: $%.2f",
+            trade.pnl,
+            trade.pnlcomm,
+            level=logging.INFO,
         )
 
-    def next(self):
-        if self.order:
-            return
 
-        condition_yesterday = self.J[-1] - self.D[-1]
-        condition_today = self.J[0] - self.D[0]
-        if not self.position:
-            # J - D value
-            # D is crossing J, from bellow up
-            # KDJ is indicating golden and dead crosses
-            if condition_yesterday < 0 < condition_today:
-                self.log(f"BUY CREATE, {self.data.close[0]:.2f}")
-                self.order = self.buy()
-
-        else:
-            if condition_yesterday > 0 or condition_today < 0:
-                self.log(f"SELL CREATE, {self.data.close[0]:.2f}")
-                self.order = self.sell()
-
-        # Log some values for the reference.
-        self.log(
-            f"Close: ${self.data.close[0]:.2f}, "
-            f"DrawDown: {self.stats.drawdown.drawdown[0]:.2f}, "
-            f"MaxDrawDown: {self.stats.drawdown.maxdrawdown[0]:.2f}, "
-            f"Cash: ${self.broker.get_cash():.2f}"
+def _specialize_next(strategy: KDJStrategy) -> Callable[[], None]:
+    """
+    Generates next() specialized for given strategy: signal values are inlined and
+    logging disabled by the current logging level is left out of the code completely.
+
+    :param strategy: KDJStrategy object.
+    :return: Specialized next method bound to the strategy.
+    """
+    log_trades: bool = _log.isEnabledFor(logging.INFO)
+    log_bars: bool = _log.isEnabledFor(logging.DEBUG)
+
+    src: list[str] = [
+        "def _fast_next(self):",
+        "    if self.order:",
+        "        return",
+        "    signal = _signals[len(self) - 1]",
+        f"    if signal == {GOLDEN_CROSS} and not self.position:",
+    ]
+    if log_trades:
+        src.append(
+            '        self.log("BUY CREATE, %.2f", self.data.close[0], level=logging.INFO)'
+        )
+    src += [
+        "        self.order = self.buy()",
+        f"    elif signal == {DEAD_CROSS} and self.position:",
+    ]
+    if log_trades:
+        src.append(
+            '        self.log("SELL CREATE, %.2f", self.data.close[0], level=logging.INFO)'
         )
+    src.append("        self.order = self.sell()")
+    if log_bars:
+        src += [
+            "    self.log(",
+            '        "Close: $%.2f, DrawDown: %.2f, MaxDrawDown: %.2f, Cash: $%.2f",',
+            "        self.data.close[0],",
+            "        self.stats.drawdown.drawdown[0],",
+            "        self.stats.drawdown.maxdrawdown[0],",
+            "        self.broker.get_cash(),",
+            "    )",
+        ]
+
+    ns: dict = {}
+    exec("\n".join(src), {"_signals": strategy._signals, "logging": logging}, ns)
+    return ns["_fast_next"].__get__(strategy, type(strategy))
+
+
+def _log_order(
+    txt: str, level: int = logging.DEBUG
+) -> Callable[[KDJStrategy, Order], None]:
+    """
+    Creates order handler logging given text.
+
+    :param txt: Text.
+    :param level: Logging level.
+    :return: Order handler.
+    """
+
+    def _handler(strategy: KDJStrategy, order: Order) -> None:
+        strategy.log(txt, level=level)
+
+    return _handler
+
+
+def _on_accepted(strategy: KDJStrategy, order: Order) -> None:
+    strategy.log("Order Accepted.")
+    strategy.order = order
+
+
+def _on_completed(strategy: KDJStrategy, order: Order) -> None:
+    strategy.log(
+        "%s EXECUTED, Price: $%.2f, Cost: $%.2f, Commission: $%.2f.",
+        "BUY" if order.isbuy() else "SELL",
+        order.executed.price,
+        order.executed.value,
+        order.executed.comm,
+        level=logging.INFO,
+    )
+    if order.isbuy():
+        strategy.buy_price = order.executed.price
+        strategy.buy_comm = order.executed.comm
+        strategy.bar_executed_close = strategy.data_close[0]
+    strategy.bar_executed = len(strategy)
+
+
+def _on_other(strategy: KDJStrategy, order: Order) -> None:
+    pass
+
+
+# Order status -> order notification handler.
+_ORDER_HANDLERS: Final[dict[int, Callable[[KDJStrategy, Order], None]]] = {
+    Order.Submitted: _log_order("Order Submitted."),
+    Order.Accepted: _on_accepted,
+    Order.Expired: _log_order("Order Expired.", logging.INFO),
+    Order.Completed: _on_completed,
+    Order.Canceled: _log_order("Order Canceled.", logging.INFO),
+    Order.Margin: _log_order("Order Margin.", logging.INFO),
+    Order.Rejected: _log_order("Order Rejected.", logging.INFO),
+}
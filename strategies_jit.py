@@ -0,0 +1,177 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+from numba import njit
+
+# Sources of the ahead-of-time compiled kdj_kernels module and file with their hash (written by build_kdj_aot.py).
+_HERE: Path = Path(__file__).resolve().parent
+AOT_SOURCES: tuple[Path, ...] = (
+    _HERE / "strategies_jit.py",
+    _HERE / "build_kdj_aot.py",
+)
+AOT_HASH_FILE: Path = _HERE / "kdj_kernels.sha256"
+
+# Signal values.
+GOLDEN_CROSS: int = 1
+DEAD_CROSS: int = -1
+NO_SIGNAL: int = 0
+
+
+@njit(cache=True)
+def rolling_max(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Highest value in rolling window, monotonic deque -> amortized O(1) per value.
+
+    :param values: Input values.
+    :param period: Window length.
+    :return: Rolling maximum, NaN for the first period - 1 values.
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    # Indices of decreasing values, the head is the maximum of the current window.
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        while tail > head and values[queue[tail - 1]] <= values[i]:
+            tail -= 1
+        queue[tail] = i
+        tail += 1
+        if queue[head] <= i - period:
+            head += 1
+        out[i] = values[queue[head]] if i >= period - 1 else np.nan
+    return out
+
+
+@njit(cache=True)
+def rolling_min(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Lowest value in rolling window, monotonic deque -> amortized O(1) per value.
+
+    :param values: Input values.
+    :param period: Window length.
+    :return: Rolling minimum, NaN for the first period - 1 values.
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    # Indices of increasing values, the head is the minimum of the current window.
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        while tail > head and values[queue[tail - 1]] >= values[i]:
+            tail -= 1
+        queue[tail] = i
+        tail += 1
+        if queue[head] <= i - period:
+            head += 1
+        out[i] = values[queue[head]] if i >= period - 1 else np.nan
+    return out
+
+
+@njit(cache=True)
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Exponential moving average with the same seeding as Backtrader's EMA (SMA of the first period values).
+
+    :param values: Input values, leading NaN values are skipped.
+    :param period: EMA period.
+    :return: EMA values, NaN before the first valid value.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    start = 0
+    while start < n and np.isnan(values[start]):
+        start += 1
+    first = start + period - 1
+    if first >= n:
+        return out
+
+    alpha = 2.0 / (1.0 + period)
+    out[first] = values[start : first + 1].mean()
+    for i in range(first + 1, n):
+        out[i] = alpha * values[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+@njit(cache=True)
+def compute_kdj(
+    highest: np.ndarray,
+    lowest: np.ndarray,
+    close: np.ndarray,
+    ema_period: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes K, D and J lines of the KDJ indicator.
+
+    :param highest: Highest prices in rolling window.
+    :param lowest: Lowest prices in rolling window.
+    :param close: Close prices.
+    :param ema_period: Period of K and D smoothing.
+    :return: Tuple of K, D and J arrays, NaN before they are defined.
+    """
+    n = close.shape[0]
+
+    # RSV value: position of the close price in the highest/lowest price range.
+    rsv = np.full(n, np.nan)
+    for i in range(n):
+        if np.isnan(highest[i]) or np.isnan(lowest[i]):
+            continue
+        price_range = highest[i] - lowest[i]
+        if price_range != 0.0:
+            rsv[i] = 100.0 * (close[i] - lowest[i]) / price_range
+        else:
+            rsv[i] = 0.0
+
+    # K is EMA of RSV, D is EMA of K, J=3*K-2*D.
+    k = _ema(rsv, ema_period)
+    d = _ema(k, ema_period)
+    j = 3.0 * k - 2.0 * d
+    return k, d, j
+
+
+@njit(cache=True)
+def kdj_signals(j: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """
+    Evaluates KDJ crosses for every bar.
+
+    :param j: J line.
+    :param d: D line.
+    :return: Array of signals: GOLDEN_CROSS (J crossing D from bellow up), DEAD_CROSS (J was above D
+        yesterday or is bellow D today) or NO_SIGNAL.
+    """
+    n = j.shape[0]
+    signals = np.zeros(n, dtype=np.int8)
+    for i in range(1, n):
+        condition_yesterday = j[i - 1] - d[i - 1]
+        condition_today = j[i] - d[i]
+        if condition_yesterday < 0.0 < condition_today:
+            signals[i] = GOLDEN_CROSS
+        elif condition_yesterday > 0.0 or condition_today < 0.0:
+            signals[i] = DEAD_CROSS
+    return signals
+
+
+def aot_source_hash() -> str:
+    """
+    Hash of the kernel sources, used for detecting stale ahead-of-time compiled kdj_kernels module.
+
+    :return: SHA-256 hex digest of AOT_SOURCES.
+    """
+    digest = hashlib.sha256()
+    for source in AOT_SOURCES:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def aot_kernels_up_to_date() -> bool:
+    """
+    Checks that kdj_kernels module was built from the current kernel sources.
+
+    :return: True if hash stored by build_kdj_aot.py matches the current sources.
+    """
+    try:
+        return AOT_HASH_FILE.read_text().strip() == aot_source_hash()
+    except OSError:
+        return False
@@ -0,0 +1,95 @@
+"""
+Tests of the local Parquet cache of BinanceDataProvider with a stubbed Binance client.
+
+Usage: python -m unittest discover -s tests -t .
+"""
+import os
+import tempfile
+import unittest
+from typing import Optional
+from unittest import mock
+
+try:
+    import pandas as pd
+
+    import binance_data_provider
+    from binance_data_provider import BinanceDataProvider
+except ImportError as error:
+    raise unittest.SkipTest(f"Binance client/pandas not installed: {error}")
+
+
+class FakeClient:
+    """
+    Binance client stub returning one daily K-line per day, including incomplete today's one.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Optional[str]]] = []
+
+    def get_historical_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_str: Optional[str] = None,
+        end_str: Optional[str] = None,
+    ) -> list[list]:
+        self.calls.append((start_str, end_str))
+        today: pd.Timestamp = pd.to_datetime("today").normalize()
+        end: pd.Timestamp = pd.Timestamp(end_str) if end_str else today
+        days = pd.date_range(pd.Timestamp(start_str), min(end, today), freq="D")
+        return [
+            [day.value // 1_000_000, "1.0", "2.0", "0.5", "1.5", "10.0", 0]
+            for day in days
+        ]
+
+
+class BinanceCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client: FakeClient = FakeClient()
+        cwd: str = os.getcwd()
+        tmp_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        os.chdir(tmp_dir.name)
+        self.addCleanup(os.chdir, cwd)
+
+        with mock.patch.object(
+            binance_data_provider, "_get_client", return_value=self.client
+        ):
+            self.dp: BinanceDataProvider = BinanceDataProvider(
+                api_key="key", api_secret="secret"
+            )
+
+    def get(self, past_days: int) -> pd.DataFrame:
+        return self.dp.get_historical_ohlcv_data(
+            token_ticker="uni", past_days=past_days, tick_interval="1d"
+        )
+
+    def test_cache_downloads_older_history(self) -> None:
+        self.assertEqual(len(self.get(past_days=30)), 30)
+        data: pd.DataFrame = self.get(past_days=1000)
+
+        self.assertEqual(len(data), 1000)
+        self.assertTrue(data.index.is_unique and data.index.is_monotonic_increasing)
+        self.assertEqual(len(self.client.calls), 2)
+        # Only the history before the cached data is downloaded.
+        self.assertIsNotNone(self.client.calls[1][1])
+
+        # Everything is cached now.
+        self.assertEqual(len(self.get(past_days=1000)), 1000)
+        self.assertEqual(len(self.get(past_days=30)), 30)
+        self.assertEqual(len(self.client.calls), 2)
+
+    def test_cache_downloads_newer_days(self) -> None:
+        self.get(past_days=30)
+        cache_path = self.dp._cache_dir / "UNIUSDT_1d.parquet"
+        # Pretend the cache is 5 days old.
+        pd.read_parquet(cache_path)[:-5].to_parquet(cache_path)
+
+        data: pd.DataFrame = self.get(past_days=30)
+
+        self.assertEqual(len(data), 30)
+        self.assertTrue(data.index.is_unique and data.index.is_monotonic_increasing)
+        self.assertEqual(len(self.client.calls), 2)
+        newer_start, newer_end = self.client.calls[1]
+        self.assertIsNone(newer_end)
+        self.assertEqual(pd.Timestamp(newer_start), data.index[-5])
@@ -0,0 +1,251 @@
+"""
+Regression check of the NumPy/Numba KDJ kernels and performance metrics against the Backtrader
+indicators and analyzers they replaced.
+
+Usage: python -m unittest discover -s tests -t .
+"""
+import unittest
+
+try:
+    import backtrader as bt
+    import numpy as np
+    from backtrader.indicators import ExponentialMovingAverage, Highest, Lowest
+except ImportError as error:
+    raise unittest.SkipTest(f"Backtrader/NumPy not installed: {error}")
+
+from backtester import Backtester
+from daily_data_feed import NumpyOHLCVFeed, OHLCVArrays
+from fractional_commission_info import FractionalCommissionInfo
+from strategies import KDJStrategy
+from strategies_jit import (
+    DEAD_CROSS,
+    GOLDEN_CROSS,
+    NO_SIGNAL,
+    compute_kdj,
+    kdj_signals,
+    rolling_max,
+    rolling_min,
+)
+
+STARTING_CASH: float = 100_000.0
+RTOL: float = 1e-9
+ATOL: float = 1e-9
+
+
+def _price_data(n: int = 800, seed: int = 7) -> OHLCVArrays:
+    """
+    Fixed daily OHLCV series (seeded random walk over ~2 years) with a flat stretch,
+    so that highest - lowest == 0 (zero RSV) is covered too.
+
+    :param n: Number of bars.
+    :param seed: Random seed.
+    :return: Tuple of dates, open, high, low, close and volume arrays.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    close: np.ndarray = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.03, n)))
+    close[300:330] = close[300]
+    opens: np.ndarray = np.r_[close[0], close[:-1]]
+    high: np.ndarray = np.maximum(opens, close) * (1.0 + rng.uniform(0.0, 0.02, n))
+    low: np.ndarray = np.minimum(opens, close) * (1.0 - rng.uniform(0.0, 0.02, n))
+    high[301:330] = low[301:330] = close[300]
+    volume: np.ndarray = rng.uniform(1e3, 1e4, n)
+    dates: np.ndarray = np.datetime64("2020-01-01") + np.arange(n).astype(
+        "timedelta64[D]"
+    )
+    return dates, opens, high, low, close, volume
+
+
+class ReferenceKDJStrategy(bt.Strategy):
+    """
+    KDJ strategy built from Backtrader indicators, as it was before the NumPy kernels.
+    """
+
+    params = dict(h_period=14, l_period=14, ema_period=3)
+
+    def __init__(self) -> None:
+        self.order = None
+        self.trades: list[tuple] = []
+        self.signals: list[int] = []
+
+        self.high = Highest(self.data.high, period=self.p.h_period)
+        self.low = Lowest(self.data.low, period=self.p.l_period)
+        self.rsv = 100.0 * bt.DivByZero(
+            self.data.close - self.low, self.high - self.low, zero=0.0
+        )
+        self.K = ExponentialMovingAverage(self.rsv, period=self.p.ema_period)
+        self.D = ExponentialMovingAverage(self.K, period=self.p.ema_period)
+        self.J = 3 * self.K - 2 * self.D
+
+    def notify_order(self, order) -> None:
+        if order.status is order.Submitted:
+            return
+        elif order.status is order.Accepted:
+            self.order = order
+            return
+        elif order.status is order.Completed:
+            self.trades.append(_trade(self, order))
+        self.order = None
+
+    def next(self) -> None:
+        condition_yesterday = self.J[-1] - self.D[-1]
+        condition_today = self.J[0] - self.D[0]
+        if condition_yesterday < 0 < condition_today:
+            self.signals.append(GOLDEN_CROSS)
+        elif condition_yesterday > 0 or condition_today < 0:
+            self.signals.append(DEAD_CROSS)
+        else:
+            self.signals.append(NO_SIGNAL)
+
+        if self.order:
+            return
+
+        if not self.position:
+            if condition_yesterday < 0 < condition_today:
+                self.order = self.buy()
+        else:
+            if condition_yesterday > 0 or condition_today < 0:
+                self.order = self.sell()
+
+
+class RecordingKDJStrategy(KDJStrategy):
+    """
+    KDJStrategy recording its executed orders.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.trades: list[tuple] = []
+
+    def notify_order(self, order) -> None:
+        if order.status is order.Completed:
+            self.trades.append(_trade(self, order))
+        super().notify_order(order)
+
+
+def _trade(strategy: bt.Strategy, order: bt.Order) -> tuple:
+    return len(strategy), order.isbuy(), order.executed.price, order.executed.size
+
+
+def _run(
+    strategy_cls: type,
+    price_data: OHLCVArrays,
+    with_analyzers: bool = False,
+    preload: bool = True,
+):
+    """
+    Runs strategy with the same broker setup as Backtester.
+
+    :param strategy_cls: Strategy class.
+    :param price_data: Tuple of dates, open, high, low, close and volume arrays.
+    :param with_analyzers: Flag for adding the analyzers replaced by analytics.py.
+    :param preload: Flag for preloading the data feed.
+    :return: Tuple of finished strategy and Cerebro engine.
+    """
+    dates, opens, highs, lows, closes, volumes = price_data
+    cerebro: bt.Cerebro = bt.Cerebro(preload=preload)
+    cerebro.addstrategy(strategy_cls)
+    cerebro.adddata(
+        NumpyOHLCVFeed(
+            dates=dates,
+            opens=opens,
+            highs=highs,
+            lows=lows,
+            closes=closes,
+            volumes=volumes,
+        )
+    )
+    cerebro.broker.setcash(cash=STARTING_CASH)
+    cerebro.broker.addcommissioninfo(FractionalCommissionInfo())
+    cerebro.addsizer(bt.sizers.PercentSizer, percents=100.0)
+    cerebro.broker.setcommission(commission=0.0)
+    cerebro.addobserver(bt.observers.DrawDown)
+    if with_analyzers:
+        cerebro.addanalyzer(
+            bt.analyzers.SharpeRatio,
+            _name="SharpeRatio",
+            riskfreerate=0,
+            timeframe=bt.TimeFrame.Days,
+            compression=1,
+            factor=365,
+            annualize=True,
+        )
+        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="DrawDown")
+        cerebro.addanalyzer(bt.analyzers.AnnualReturn, _name="AnnualReturn")
+    return cerebro.run()[0], cerebro
+
+
+class KDJRegressionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.price_data = _price_data()
+        cls.reference, cls.reference_cerebro = _run(
+            ReferenceKDJStrategy, cls.price_data
+        )
+
+    def assert_lines_equal(self, expected, actual: np.ndarray) -> None:
+        np.testing.assert_allclose(
+            np.asarray(expected), actual, rtol=RTOL, atol=ATOL, equal_nan=True
+        )
+
+    def test_kdj_lines_match_backtrader_indicators(self) -> None:
+        _, _, high, low, close, _ = self.price_data
+        highest: np.ndarray = rolling_max(high, 14)
+        lowest: np.ndarray = rolling_min(low, 14)
+        k, d, j = compute_kdj(highest, lowest, close, 3)
+
+        self.assert_lines_equal(self.reference.high.array, highest)
+        self.assert_lines_equal(self.reference.low.array, lowest)
+        self.assert_lines_equal(self.reference.K.array, k)
+        self.assert_lines_equal(self.reference.D.array, d)
+        self.assert_lines_equal(self.reference.J.array, j)
+
+    def test_signals_match_backtrader_conditions(self) -> None:
+        _, _, high, low, close, _ = self.price_data
+        _, d, j = compute_kdj(rolling_max(high, 14), rolling_min(low, 14), close, 3)
+        signals: np.ndarray = kdj_signals(j, d)
+
+        # Reference next() runs only after the indicators' minimum period.
+        expected: list[int] = self.reference.signals
+        self.assertEqual(signals[-len(expected) :].tolist(), expected)
+        self.assertTrue(
+            np.all(signals[: -len(expected)] == NO_SIGNAL), "signal before warm-up"
+        )
+
+    def test_trades_match_backtrader_strategy(self) -> None:
+        strategy, cerebro = _run(RecordingKDJStrategy, self.price_data)
+
+        self.assertGreater(len(self.reference.trades), 0)
+        self.assertEqual(strategy.trades, self.reference.trades)
+        self.assertEqual(
+            cerebro.broker.getvalue(), self.reference_cerebro.broker.getvalue()
+        )
+
+    def test_metrics_match_backtrader_analyzers(self) -> None:
+        reference, _ = _run(KDJStrategy, self.price_data, with_analyzers=True)
+        br, _, _ = Backtester(starting_cash=STARTING_CASH)._run_cerebro(
+            token_ticker="test",
+            denomination_ticker="usdt",
+            strategy_name="kdj",
+            price_data=self.price_data,
+        )
+
+        self.assertAlmostEqual(
+            br.sharpe_ratio,
+            reference.analyzers.getbyname("SharpeRatio").rets["sharperatio"],
+            places=9,
+        )
+        self.assertAlmostEqual(
+            br.max_draw_down,
+            reference.analyzers.getbyname("DrawDown").rets["max"]["drawdown"],
+            places=9,
+        )
+        np.testing.assert_allclose(
+            br.total_returns,
+            reference.analyzers.getbyname("AnnualReturn").rets,
+            rtol=RTOL,
+            atol=ATOL,
+        )
+
+    def test_not_preloaded_feed_is_rejected(self) -> None:
+        with self.assertRaisesRegex(Exception, "preload=True"):
+            _run(KDJStrategy, self.price_data, preload=False)
@@ -1,11 +1,13 @@
 import logging
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing.queues import Queue
 from os import path
 from pathlib import Path
 from typing import Optional
 
-from config import LOG_TO_FILE, LOGGING_LEVEL
+from config import Settings, get_config
 
 
 def logging_setup(log_file_prefix: str = "") -> Optional[str]:
@@ -15,7 +17,8 @@ def logging_setup(log_file_prefix: str = "") -> Optional[str]:
     :param log_file_prefix: String prefix for the log file.
     :return: If LOG_TO_FILE -> returns name of the log file.
     """
-    if LOG_TO_FILE:
+    cfg: Settings = get_config()
+    if cfg.LOG_TO_FILE:
         destination: Path = Path("./logs")
         Path(destination).mkdir(parents=True, exist_ok=True)
 
@@ -29,7 +32,7 @@ def logging_setup(log_file_prefix: str = "") -> Optional[str]:
             f"{log_prefix}{str(datetime.now().strftime('%Y-%m-%d_%H-%M-%S'))}.log"
         )
         logging.basicConfig(
-            level=LOGGING_LEVEL,
+            level=cfg.LOGGING_LEVEL,
             format="%(asctime)s | %(levelname)-7s | %(filename)s:%(lineno)d | %(message)s",
             handlers=[
                 logging.FileHandler(destination / log_file_name),
@@ -40,9 +43,35 @@ def logging_setup(log_file_prefix: str = "") -> Optional[str]:
         return log_file_name
     else:
         logging.basicConfig(
-            level=LOGGING_LEVEL,
+            level=cfg.LOGGING_LEVEL,
             format="%(asctime)s | %(levelname)-7s | %(filename)s:%(lineno)d | %(message)s",
             handlers=[logging.StreamHandler(sys.stdout)],
             force=True,
         )
         return None
+
+
+def logging_listener(queue: Queue) -> QueueListener:
+    """
+    Listener writing log records of worker processes by the handlers of this (main) process.
+
+    :param queue: Queue receiving log records from worker processes.
+    :return: QueueListener object, not started.
+    """
+    return QueueListener(
+        queue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+
+
+def worker_logging_setup(queue: Queue, level: int) -> None:
+    """
+    Logging setting of worker process (ProcessPoolExecutor initializer), records are sent to the main process.
+
+    :param queue: Queue of main process logging listener.
+    :param level: Logging level of main process.
+    :return: None.
+    """
+    # Records are formatted by the main process handlers, only the message is merged with its arguments here.
+    logging.basicConfig(
+        level=level, format="%(message)s", handlers=[QueueHandler(queue)], force=True
+    )